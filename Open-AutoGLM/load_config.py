@@ -3,11 +3,11 @@
 从 config.yaml 读取配置并提供给主程序使用
 """
 
+import copy
 import os
 import sys
-import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 # 设置 Windows 下的 UTF-8 输出
 if sys.platform == 'win32':
@@ -15,6 +15,9 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
+# 已解析配置的缓存,键为 (配置文件路径, 修改时间),文件变更后自动失效
+_CONFIG_CACHE: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
 
 def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -26,6 +29,9 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     Returns:
         配置字典
     """
+    # 仅在真正读取配置文件时才导入 yaml
+    import yaml
+    
     if config_path is None:
         # 默认配置文件路径（项目根目录下的 config.yaml）
         config_path = Path(__file__).parent / "config.yaml"
@@ -33,20 +39,30 @@ def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
         config_path = Path(config_path)
     
     # 检查配置文件是否存在
-    if not config_path.exists():
+    try:
+        cache_key = (str(config_path.resolve()), config_path.stat().st_mtime_ns)
+    except FileNotFoundError:
         print(f"⚠️  配置文件不存在: {config_path}")
         print("将使用默认配置或环境变量")
         return {}
     
+    # 文件未变更时直接返回已解析的结果
+    if cache_key in _CONFIG_CACHE:
+        return copy.deepcopy(_CONFIG_CACHE[cache_key])
+    
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            # 优先使用 libyaml 的 C 实现,不可用时回退到纯 Python 解析器
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            config = yaml.load(f, Loader=loader)
             
         if config is None:
-            return {}
-            
-        print(f"✅ 已加载配置文件: {config_path}")
-        return config
+            config = {}
+        else:
+            print(f"✅ 已加载配置文件: {config_path}")
+        
+        _CONFIG_CACHE[cache_key] = config
+        return copy.deepcopy(config)
         
     except yaml.YAMLError as e:
         print(f"❌ 配置文件格式错误: {e}")
@@ -132,6 +148,20 @@ def get_ios_config(config: Dict[str, Any]) -> Dict[str, str]:
     }
 
 
+# 可由环境变量和命令行参数覆盖的配置项:
+# (配置段, 配置键, 命令行参数名, 环境变量名, 命令行参数默认值, 类型转换)
+# 命令行参数与其默认值(即环境变量或内置默认值)相同时视为未显式指定
+_OVERRIDABLE_FIELDS = (
+    ('model', 'base_url', 'base_url', 'PHONE_AGENT_BASE_URL', 'http://localhost:8000/v1', str),
+    ('model', 'model_name', 'model', 'PHONE_AGENT_MODEL', 'autoglm-phone-9b', str),
+    ('model', 'api_key', 'apikey', 'PHONE_AGENT_API_KEY', 'EMPTY', str),
+    ('agent', 'max_steps', 'max_steps', 'PHONE_AGENT_MAX_STEPS', '100', int),
+    ('agent', 'device_type', 'device_type', 'PHONE_AGENT_DEVICE_TYPE', 'adb', str),
+    ('agent', 'lang', 'lang', 'PHONE_AGENT_LANG', 'cn', str),
+    ('ios', 'wda_url', 'wda_url', 'PHONE_AGENT_WDA_URL', 'http://localhost:8100', str),
+)
+
+
 def merge_with_env_and_args(
     config: Dict[str, Any],
     args: Any
@@ -147,86 +177,44 @@ def merge_with_env_and_args(
     Returns:
         合并后的配置
     """
-    model_config = get_model_config(config)
-    agent_config = get_agent_config(config)
-    ios_config = get_ios_config(config)
-    
-    # 模型配置合并（优先使用命令行参数，其次环境变量，最后配置文件）
-    base_url = (
-        args.base_url if hasattr(args, 'base_url') and args.base_url != os.getenv("PHONE_AGENT_BASE_URL", "http://localhost:8000/v1")
-        else os.getenv("PHONE_AGENT_BASE_URL", model_config['base_url'])
-    )
-    
-    model_name = (
-        args.model if hasattr(args, 'model') and args.model != os.getenv("PHONE_AGENT_MODEL", "autoglm-phone-9b")
-        else os.getenv("PHONE_AGENT_MODEL", model_config['model_name'])
-    )
-    
-    api_key = (
-        args.apikey if hasattr(args, 'apikey') and args.apikey != os.getenv("PHONE_AGENT_API_KEY", "EMPTY")
-        else os.getenv("PHONE_AGENT_API_KEY", model_config['api_key'])
-    )
-    
-    # Agent 配置合并
-    max_steps = (
-        args.max_steps if hasattr(args, 'max_steps') and args.max_steps != int(os.getenv("PHONE_AGENT_MAX_STEPS", "100"))
-        else int(os.getenv("PHONE_AGENT_MAX_STEPS", str(agent_config['max_steps'])))
-    )
+    merged = {
+        'model': get_model_config(config),
+        'model_params': get_model_params(config),
+        'agent': get_agent_config(config),
+        'ios': get_ios_config(config),
+    }
+    arg_values = vars(args) if args is not None else {}
     
-    device_id = (
-        args.device_id if hasattr(args, 'device_id') and args.device_id
-        else os.getenv("PHONE_AGENT_DEVICE_ID", agent_config['device_id'])
-    )
+    for section, key, arg_name, env_key, default, cast in _OVERRIDABLE_FIELDS:
+        env_value = os.getenv(env_key)
+        arg_default = cast(default if env_value is None else env_value)
+        
+        if arg_name in arg_values and arg_values[arg_name] != arg_default:
+            merged[section][key] = arg_values[arg_name]
+        elif env_value is not None:
+            merged[section][key] = cast(env_value)
+        elif cast is not str and merged[section][key] is not None:
+            # 配置文件中的值原样保留,只有数值项需要转换 (可能写成字符串)
+            merged[section][key] = cast(str(merged[section][key]))
     
-    device_type = (
-        args.device_type if hasattr(args, 'device_type') and args.device_type != os.getenv("PHONE_AGENT_DEVICE_TYPE", "adb")
-        else os.getenv("PHONE_AGENT_DEVICE_TYPE", agent_config['device_type'])
-    )
+    agent = merged['agent']
     
-    lang = (
-        args.lang if hasattr(args, 'lang') and args.lang != os.getenv("PHONE_AGENT_LANG", "cn")
-        else os.getenv("PHONE_AGENT_LANG", agent_config['lang'])
-    )
+    # 设备 ID 没有默认值,命令行参数非空即生效
+    if arg_values.get('device_id'):
+        agent['device_id'] = arg_values['device_id']
+    else:
+        agent['device_id'] = os.getenv("PHONE_AGENT_DEVICE_ID", agent['device_id'])
     
-    verbose = not args.quiet if hasattr(args, 'quiet') else agent_config['verbose']
+    if 'quiet' in arg_values:
+        agent['verbose'] = not arg_values['quiet']
     
     # 截图配置（优先使用命令行参数，否则使用配置文件）
-    save_screenshots = (
-        args.save_screenshots if hasattr(args, 'save_screenshots') 
-        else agent_config.get('save_screenshots', False)
-    )
-    
-    screenshot_dir = (
-        args.screenshot_dir if hasattr(args, 'screenshot_dir') and args.screenshot_dir
-        else agent_config.get('screenshot_dir', './screenshots')
-    )
+    if 'save_screenshots' in arg_values:
+        agent['save_screenshots'] = arg_values['save_screenshots']
+    if arg_values.get('screenshot_dir'):
+        agent['screenshot_dir'] = arg_values['screenshot_dir']
     
-    # iOS 配置
-    wda_url = (
-        args.wda_url if hasattr(args, 'wda_url') and args.wda_url != os.getenv("PHONE_AGENT_WDA_URL", "http://localhost:8100")
-        else os.getenv("PHONE_AGENT_WDA_URL", ios_config['wda_url'])
-    )
-    
-    return {
-        'model': {
-            'base_url': base_url,
-            'model_name': model_name,
-            'api_key': api_key,
-        },
-        'model_params': get_model_params(config),
-        'agent': {
-            'max_steps': max_steps,
-            'device_id': device_id,
-            'device_type': device_type,
-            'lang': lang,
-            'verbose': verbose,
-            'save_screenshots': save_screenshots,
-            'screenshot_dir': screenshot_dir,
-        },
-        'ios': {
-            'wda_url': wda_url,
-        }
-    }
+    return merged
 
 
 def print_config_summary(merged_config: Dict[str, Any]) -> None:
@@ -265,7 +253,10 @@ def print_config_summary(merged_config: Dict[str, Any]) -> None:
 
 
 if __name__ == "__main__":
+    import yaml
+    
     # 测试配置加载
     config = load_config()
     print("\n加载的配置:")
-    print(yaml.dump(config, allow_unicode=True, default_flow_style=False))
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    print(yaml.dump(config, Dumper=dumper, allow_unicode=True, default_flow_style=False))
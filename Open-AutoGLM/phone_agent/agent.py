@@ -3,6 +3,7 @@
 import base64
 import json
 import os
+import threading
 import traceback
 from dataclasses import dataclass
 from datetime import datetime
@@ -92,12 +93,14 @@ class PhoneAgent:
         if self.agent_config.save_screenshots:
             self._setup_screenshot_directory()
 
-    def run(self, task: str) -> str:
+    def run(self, task: str, cancel_event: threading.Event | None = None) -> str:
         """
         Run the agent to complete a task.
 
         Args:
             task: Natural language description of the task.
+            cancel_event: Optional event checked between steps; once it is
+                set the agent stops before taking the next step.
 
         Returns:
             Final message from the agent.
@@ -111,8 +114,11 @@ class PhoneAgent:
         if result.finished:
             return result.message or "Task completed"
 
-        # Continue until finished or max steps reached
+        # Continue until finished, cancelled or max steps reached
         while self._step_count < self.agent_config.max_steps:
+            if cancel_event is not None and cancel_event.is_set():
+                return "Task cancelled"
+
             result = self._execute_step(is_first=False)
 
             if result.finished:
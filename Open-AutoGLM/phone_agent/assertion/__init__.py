@@ -1,13 +1,34 @@
 """断言模块 - 用于测试流程的断言验证."""
 
-from .assertion_watcher import AssertionWatcher
-from .ocr_engine import OCREngine
-from .image_diff import ImageDiffChecker
-from .runner import AssertionRunner
+import importlib
+
+# 子模块在首次访问对应属性时才导入 (PEP 562),避免拖慢不使用断言的启动流程
+_LAZY_ATTRS = {
+    'AssertionWatcher': '.assertion_watcher',
+    'OCREngine': '.ocr_engine',
+    'ImageDiffChecker': '.image_diff',
+    'AssertionRunner': '.runner',
+    'default_ocr_engine': '.ocr_engine',
+    'default_image_diff_checker': '.image_diff',
+}
 
 __all__ = [
     'AssertionWatcher',
     'OCREngine',
     'ImageDiffChecker',
     'AssertionRunner',
+    'default_ocr_engine',
+    'default_image_diff_checker',
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,11 +1,18 @@
 """断言监听器 - 边执行边监听断言条件."""
 
+import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from .ocr_engine import OCREngine
-from .image_diff import ImageDiffChecker
+from .ocr_engine import OCREngine, default_ocr_engine
+from .image_diff import ImageDiffChecker, default_image_diff_checker, frame_digest
+
+# 基于 OCR 文字的断言类型,同一帧上共享一次识别结果
+TEXT_ASSERTION_TYPES = ("text_exists", "text_not_exists")
 
 
 @dataclass
@@ -14,6 +21,15 @@ class Assertion:
     type: str  # text_exists, text_not_exists, image_changed
     value: str  # 断言值
     timeout: float = 10.0  # 超时时间(秒)
+    value_bytes: bytes = field(init=False, repr=False, compare=False)  # 文字断言值的 UTF-8 编码
+    
+    def __post_init__(self):
+        # 文字断言预先编码一次,轮询时直接做字节串包含判断;
+        # 其他类型不使用该值 (如 image_changed 的 value 可以为 None)
+        if self.type in TEXT_ASSERTION_TYPES:
+            self.value_bytes = str(self.value).encode('utf-8')
+        else:
+            self.value_bytes = b""
 
 
 class AssertionWatcher:
@@ -41,22 +57,36 @@ class AssertionWatcher:
         
         Args:
             screenshot_func: 截图函数,返回 base64 编码的图片
-            ocr_engine: OCR 引擎
-            image_diff_checker: 图片差异检测器
+            ocr_engine: OCR 引擎,默认使用共享实例
+            image_diff_checker: 图片差异检测器,默认使用共享实例
             poll_interval: 轮询间隔(秒)
             stable_frames: 画面稳定帧数
-            stable_threshold: 画面稳定阈值
+            stable_threshold: 画面稳定阈值 (0.0-1.0). 相邻帧的差异取 128 位 dHash
+                不同比特所占比例;两帧内容不同而哈希差异未超过阈值时 (如整体
+                变暗的遮罩),再用缩小后的像素平均差异 (calculate_diff) 复核,
+                取两者较大值
         """
         self.screenshot_func = screenshot_func
-        self.ocr_engine = ocr_engine or OCREngine()
-        self.image_diff_checker = image_diff_checker or ImageDiffChecker()
+        self.ocr_engine = ocr_engine or default_ocr_engine()
+        self.image_diff_checker = image_diff_checker or default_image_diff_checker()
         self.poll_interval = poll_interval
         self.stable_frames = stable_frames
         self.stable_threshold = stable_threshold
         
         self._running = False
+        # 单线程预取下一帧截图,使截图耗时与当前帧的 OCR/比对并行
+        self._screenshot_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="assertion-screenshot"
+        )
+        self._stop_event = threading.Event()
+        # 上一帧 (ImageDiffChecker.decode() 的结果),仅 image_changed 断言使用
         self._last_screenshot = None
-        self._recent_screenshots = []  # 用于画面稳定判定
+        # 画面稳定判定只保存每帧的 64 位 dHash 及相邻帧的哈希差异
+        self._recent_hashes = deque(maxlen=stable_frames)
+        self._recent_diffs = deque(maxlen=max(stable_frames - 1, 0))
+        # 最近一次记录哈希的帧及其内容摘要,用于复核哈希差异
+        self._hashed_frame = None
+        self._hashed_digest: Optional[bytes] = None
     
     def check_assertion(self, assertion: Assertion, current_screenshot: str) -> bool:
         """
@@ -73,18 +103,20 @@ class AssertionWatcher:
         if not self._is_screen_stable():
             return False
         
+        # 两种文字断言都基于同一帧缓存的 OCR 结果,每帧最多识别一次
         if assertion.type == "text_exists":
-            return self.ocr_engine.contains_text(current_screenshot, assertion.value)
+            return self.ocr_engine.contains_text(current_screenshot, assertion.value_bytes)
         
         elif assertion.type == "text_not_exists":
-            return self.ocr_engine.not_contains_text(current_screenshot, assertion.value)
+            return not self.ocr_engine.contains_text(current_screenshot, assertion.value_bytes)
         
         elif assertion.type == "image_changed":
             if self._last_screenshot is None:
                 return False
+            # decode() 按内容缓存,watch() 中已解码过的当前帧不会重复解码
             return self.image_diff_checker.has_changed(
                 self._last_screenshot,
-                current_screenshot
+                self.image_diff_checker.decode(current_screenshot)
             )
         
         return False
@@ -101,33 +133,77 @@ class AssertionWatcher:
             (是否命中, 命中的断言描述)
         """
         self._running = True
-        start_time = time.time()
+        self._stop_event.clear()
+        start_time = time.monotonic()
+        # 按固定节拍截图,循环体耗时不会累加到轮询间隔上
+        next_capture_at = start_time
         
         print(f"🔍 开始监听断言 (超时: {timeout}秒)")
         print(f"   断言数量: {len(assertions)}")
         
-        while self._running and (time.time() - start_time) < timeout:
-            # 获取当前截图
-            current_screenshot = self.screenshot_func()
-            
-            # 记录到最近截图列表(用于稳定性判定)
-            self._recent_screenshots.append(current_screenshot)
-            if len(self._recent_screenshots) > self.stable_frames:
-                self._recent_screenshots.pop(0)
-            
-            # 检查每个断言
-            for assertion in assertions:
-                if self.check_assertion(assertion, current_screenshot):
+        # 按类型分组: 文字断言共用一次 OCR,其余断言逐个检查
+        # text_exists 的目标编译为一个正则选择分支,每帧只需扫描一次
+        exists_by_value: Dict[bytes, Assertion] = {}
+        for a in assertions:
+            if a.type == "text_exists":
+                exists_by_value.setdefault(a.value_bytes, a)
+        exists_pattern = (
+            re.compile(b"|".join(re.escape(value) for value in exists_by_value))
+            if exists_by_value else None
+        )
+        not_exists_assertions = [a for a in assertions if a.type == "text_not_exists"]
+        other_assertions = [a for a in assertions if a.type not in TEXT_ASSERTION_TYPES]
+        
+        next_screenshot = self._screenshot_pool.submit(self.screenshot_func)
+        try:
+            while self._running and (time.monotonic() - start_time) < timeout:
+                # 获取当前截图
+                current_screenshot = next_screenshot.result()
+                if current_screenshot is None:
+                    # 等待期间监听已被停止
+                    break
+                
+                # 预取下一帧: 到下一个轮询时刻在后台截图
+                next_capture_at += self.poll_interval
+                next_screenshot = self._screenshot_pool.submit(
+                    self._capture_at, next_capture_at
+                )
+                
+                # 截图内容摘要每帧只算一次,解码缓存与 OCR 缓存共用
+                current_digest = frame_digest(current_screenshot)
+                
+                # 解码后记录哈希(用于稳定性判定)
+                current_frame = self.image_diff_checker.decode(current_screenshot, current_digest)
+                current_hash = self.image_diff_checker.dhash(current_frame)
+                if self._recent_hashes:
+                    self._recent_diffs.append(
+                        self._frame_diff(current_hash, current_frame, current_digest)
+                    )
+                self._recent_hashes.append(current_hash)
+                self._hashed_frame = current_frame
+                self._hashed_digest = current_digest
+                
+                # 检查断言
+                hit = self._find_hit(
+                    exists_pattern,
+                    exists_by_value,
+                    not_exists_assertions,
+                    other_assertions,
+                    current_screenshot,
+                    current_digest
+                )
+                if hit is not None:
                     self._running = False
-                    msg = f"断言命中: {assertion.type} = {assertion.value}"
+                    msg = f"断言命中: {hit.type} = {hit.value}"
                     print(f"✅ {msg}")
                     return True, msg
-            
-            # 保存当前截图用于下次比较
-            self._last_screenshot = current_screenshot
-            
-            # 等待下次轮询
-            time.sleep(self.poll_interval)
+                
+                # 保存当前帧用于下次比较
+                self._last_screenshot = current_frame
+        finally:
+            # 取消尚未完成的预取,避免监听结束后继续截图
+            self._stop_event.set()
+            next_screenshot.cancel()
         
         # 超时未命中
         self._running = False
@@ -137,6 +213,76 @@ class AssertionWatcher:
     def stop(self):
         """停止监听."""
         self._running = False
+        self._stop_event.set()
+    
+    def _find_hit(
+        self,
+        exists_pattern: Optional["re.Pattern[bytes]"],
+        exists_by_value: Dict[bytes, Assertion],
+        not_exists_assertions: List[Assertion],
+        other_assertions: List[Assertion],
+        current_screenshot: str,
+        current_digest: Optional[bytes] = None
+    ) -> Optional[Assertion]:
+        """
+        返回当前帧命中的第一个断言,没有命中时返回 None.
+        
+        所有文字断言只对当前帧做一次 OCR;text_exists 目标通过一次正则扫描
+        同时判断,text_not_exists 目标逐个做子串判断.
+        """
+        # 只在画面稳定时执行检查
+        if not self._is_screen_stable():
+            return None
+        
+        if exists_pattern is not None or not_exists_assertions:
+            screen_bytes = self.ocr_engine.get_screen_bytes(current_screenshot, current_digest)
+            
+            if exists_pattern is not None:
+                match = exists_pattern.search(screen_bytes)
+                if match is not None:
+                    return exists_by_value[match.group()]
+            
+            for assertion in not_exists_assertions:
+                if assertion.value_bytes not in screen_bytes:
+                    return assertion
+        
+        for assertion in other_assertions:
+            if self.check_assertion(assertion, current_screenshot):
+                return assertion
+        
+        return None
+    
+    def _capture_at(self, capture_at: float) -> Optional[str]:
+        """
+        等到指定时刻 (time.monotonic) 后截图 (在预取线程中执行).
+        
+        监听停止时立即返回 None,不再截图.
+        """
+        delay = capture_at - time.monotonic()
+        if delay > 0 and self._stop_event.wait(delay):
+            return None
+        if self._stop_event.is_set():
+            return None
+        return self.screenshot_func()
+    
+    def _frame_diff(self, current_hash: int, current_frame, current_digest: bytes) -> float:
+        """
+        计算当前帧与上一帧的差异度,用于稳定性判定.
+        
+        先比较 dHash;哈希差异不超过稳定阈值但两帧内容不同时,用缩小后的
+        像素平均差异复核,避免整体明暗变化被判为稳定.
+        """
+        diff = self.image_diff_checker.hash_diff(self._recent_hashes[-1], current_hash)
+        if (
+            diff <= self.stable_threshold
+            and self._hashed_frame is not None
+            and current_digest != self._hashed_digest
+        ):
+            diff = max(
+                diff,
+                self.image_diff_checker.calculate_diff(self._hashed_frame, current_frame)
+            )
+        return diff
     
     def _is_screen_stable(self) -> bool:
         """
@@ -144,11 +290,11 @@ class AssertionWatcher:
         
         只有在画面稳定时才执行 OCR/图片断言,避免操作过程中误判.
         """
-        if len(self._recent_screenshots) < self.stable_frames:
+        if len(self._recent_hashes) < self.stable_frames:
             return False
         
-        return self.image_diff_checker.is_stable(
-            self._recent_screenshots,
+        return self.image_diff_checker.is_stable_from_diffs(
+            self._recent_diffs,
             self.stable_frames,
             self.stable_threshold
         )
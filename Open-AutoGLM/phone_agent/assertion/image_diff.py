@@ -1,10 +1,77 @@
 """图片差异检测 - 用于判断屏幕是否发生变化."""
 
 import base64
-import numpy as np
-from typing import Optional
+import functools
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, Optional, Sequence, Union
 from io import BytesIO
 
+# numpy / PIL / OpenCV 均在首次使用时才导入,不使用断言时不影响启动速度
+if TYPE_CHECKING:
+    import numpy as np
+
+# 比较前将截图缩小到该尺寸以内,判断"画面是否变化"不需要全分辨率
+DIFF_SIZE = (256, 256)
+
+# dhash() 的比特数: 水平、垂直方向的相邻像素明暗关系各 64 位
+HASH_BITS = 128
+
+# 按截图内容缓存的解码结果数量
+FRAME_CACHE_SIZE = 8
+
+# 可参与比较的帧: base64 截图,或 decode() 得到的缩小后数组
+Frame = Union[str, "np.ndarray"]
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cv2():
+    """导入 OpenCV,未安装时返回 None (OpenCV 为可选依赖)."""
+    try:
+        import cv2
+    except ImportError:
+        return None
+    return cv2
+
+
+def frame_digest(image_base64: str) -> bytes:
+    """
+    计算截图内容的 16 字节 BLAKE2b 摘要.
+    
+    解码缓存与 OCR 缓存共用该摘要作为键,每帧只需计算一次.
+    """
+    return hashlib.blake2b(image_base64.encode('ascii'), digest_size=16).digest()
+
+
+def _decode_frame(image_base64: str) -> "np.ndarray":
+    """解码 base64 截图并缩小,返回只读数组."""
+    import numpy as np
+    
+    raw = base64.b64decode(image_base64)
+    
+    # OpenCV 可在解码阶段直接输出 1/4 分辨率,省去完整解码的开销
+    cv2 = _get_cv2()
+    if cv2 is not None:
+        arr = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_REDUCED_COLOR_4)
+        if arr is not None:
+            height, width = arr.shape[:2]
+            scale = min(DIFF_SIZE[0] / width, DIFF_SIZE[1] / height)
+            if scale < 1:
+                arr = cv2.resize(
+                    arr,
+                    (max(1, int(width * scale)), max(1, int(height * scale))),
+                    interpolation=cv2.INTER_NEAREST,
+                )
+            arr.setflags(write=False)
+            return arr
+    
+    from PIL import Image
+    img = Image.open(BytesIO(raw))
+    img.thumbnail(DIFF_SIZE, Image.Resampling.NEAREST)
+    arr = np.asarray(img.convert("RGB"))
+    arr.setflags(write=False)
+    return arr
+
 
 class ImageDiffChecker:
     """图片差异检测器,用于判断两张图片是否发生明显变化."""
@@ -17,58 +84,151 @@ class ImageDiffChecker:
             threshold: 差异阈值 (0.0-1.0),超过该值认为发生明显变化
         """
         self.threshold = threshold
+        # 按截图内容摘要缓存解码结果,缓存键只保存 16 字节摘要,不持有截图本身
+        self._frame_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        # 最近一次解码的截图及结果,同一个对象再次传入时无需计算摘要
+        self._last_image: Optional[str] = None
+        self._last_frame = None
     
-    def calculate_diff(self, image1_base64: str, image2_base64: str) -> float:
+    def decode(self, image_base64: str, digest: Optional[bytes] = None) -> "np.ndarray":
         """
-        计算两张图片的差异度.
+        解码 base64 截图并缩小为用于比较的 uint8 数组.
+        
+        最近解码过的截图按内容摘要缓存,重复传入同一张截图不会再次解码.
+        返回的数组为只读,调用方不可修改.
         
         Args:
-            image1_base64: 第一张图片的 base64 数据
-            image2_base64: 第二张图片的 base64 数据
+            image_base64: 图片的 base64 数据
+            digest: 可选,调用方已算好的 frame_digest(image_base64)
             
         Returns:
-            差异度 (0.0-1.0)
+            形状为 (H, W, 3) 的 uint8 数组 (通道顺序取决于解码后端,
+            同一进程内保持一致)
         """
-        try:
-            # 解码图片
-            img1_data = base64.b64decode(image1_base64)
-            img2_data = base64.b64decode(image2_base64)
-            
-            # 使用 PIL 加载图片
-            from PIL import Image
-            img1 = Image.open(BytesIO(img1_data))
-            img2 = Image.open(BytesIO(img2_data))
-            
-            # 转换为相同大小
-            if img1.size != img2.size:
-                img2 = img2.resize(img1.size)
+        if image_base64 is self._last_image:
+            return self._last_frame
+        
+        key = digest if digest is not None else frame_digest(image_base64)
+        frame = self._frame_cache.get(key)
+        if frame is None:
+            frame = _decode_frame(image_base64)
+            self._frame_cache[key] = frame
+            if len(self._frame_cache) > FRAME_CACHE_SIZE:
+                self._frame_cache.popitem(last=False)
+        else:
+            self._frame_cache.move_to_end(key)
+        self._last_image = image_base64
+        self._last_frame = frame
+        return frame
+    
+    def pairwise_diffs(self, frames: Sequence[Frame]) -> "np.ndarray":
+        """
+        计算相邻帧之间的差异度.
+        
+        所有帧只解码一次并堆叠为 (N, H, W, C) 数组,用一次向量化运算
+        得到全部 N-1 个相邻差异.
+        
+        Args:
+            frames: 按时间顺序排列的帧 (base64 数据或 decode() 的结果)
             
-            # 转换为 numpy 数组
-            arr1 = np.array(img1)
-            arr2 = np.array(img2)
+        Returns:
+            形状为 (N-1,) 的差异度数组 (0.0-1.0)
+        """
+        import numpy as np
+        
+        arrays = [self._as_array(frame) for frame in frames]
+        
+        # 转换为相同大小
+        shape = arrays[0].shape
+        for i, arr in enumerate(arrays):
+            if arr.shape != shape:
+                from PIL import Image
+                arrays[i] = np.asarray(
+                    Image.fromarray(arr).resize((shape[1], shape[0]), Image.Resampling.NEAREST)
+                )
+        
+        # 计算像素差异
+        stack = np.stack(arrays).astype(np.int16)
+        diff = np.abs(stack[1:] - stack[:-1])
+        return diff.mean(axis=tuple(range(1, diff.ndim))) / 255.0
+    
+    def dhash(self, image: Frame) -> int:
+        """
+        计算图片的 128 位差异哈希 (dHash).
+        
+        将灰度图分别缩小为 9x8 和 8x9,按水平、垂直方向相邻像素的明暗关系
+        各生成 64 个比特,纯垂直方向的变化 (如底部弹层滑入) 也能反映出来.
+        用于廉价地判断画面是否稳定,不适合判断细小的变化;对整体明暗变化
+        (如半透明遮罩) 不敏感.
+        
+        Args:
+            image: 图片 (base64 数据或 decode() 的结果)
             
-            # 计算像素差异
-            diff = np.abs(arr1.astype(float) - arr2.astype(float))
-            diff_ratio = np.mean(diff) / 255.0
+        Returns:
+            HASH_BITS 位哈希值
+        """
+        import numpy as np
+        
+        arr = self._as_array(image)
+        cv2 = _get_cv2()
+        if cv2 is not None:
+            gray = cv2.cvtColor(arr, cv2.COLOR_BGR2GRAY)
+            horizontal = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+            vertical = cv2.resize(gray, (8, 9), interpolation=cv2.INTER_AREA)
+        else:
+            from PIL import Image
+            gray = Image.fromarray(arr).convert("L")
+            horizontal = np.asarray(gray.resize((9, 8), Image.Resampling.BILINEAR))
+            vertical = np.asarray(gray.resize((8, 9), Image.Resampling.BILINEAR))
+        
+        bits = np.concatenate((
+            (horizontal[:, 1:] > horizontal[:, :-1]).ravel(),
+            (vertical[1:, :] > vertical[:-1, :]).ravel(),
+        ))
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+    
+    def hash_diff(self, hash1: int, hash2: int) -> float:
+        """
+        计算两个 dHash 的差异度 (不同比特所占比例).
+        
+        Args:
+            hash1: 第一个哈希值
+            hash2: 第二个哈希值
             
-            return diff_ratio
+        Returns:
+            差异度 (0.0-1.0)
+        """
+        return (hash1 ^ hash2).bit_count() / HASH_BITS
+    
+    def calculate_diff(self, image1: Frame, image2: Frame) -> float:
+        """
+        计算两张图片的差异度.
+        
+        Args:
+            image1: 第一张图片 (base64 数据或 decode() 的结果)
+            image2: 第二张图片 (base64 数据或 decode() 的结果)
             
+        Returns:
+            差异度 (0.0-1.0)
+        """
+        try:
+            return float(self.pairwise_diffs([image1, image2])[0])
         except Exception as e:
             print(f"⚠️  计算图片差异失败: {e}")
             return 0.0
     
-    def has_changed(self, image1_base64: str, image2_base64: str) -> bool:
+    def has_changed(self, image1: Frame, image2: Frame) -> bool:
         """
         判断两张图片是否发生明显变化.
         
         Args:
-            image1_base64: 第一张图片的 base64 数据
-            image2_base64: 第二张图片的 base64 数据
+            image1: 第一张图片 (base64 数据或 decode() 的结果)
+            image2: 第二张图片 (base64 数据或 decode() 的结果)
             
         Returns:
             是否发生明显变化
         """
-        diff = self.calculate_diff(image1_base64, image2_base64)
+        diff = self.calculate_diff(image1, image2)
         return diff > self.threshold
     
     def is_stable(
@@ -80,8 +240,11 @@ class ImageDiffChecker:
         """
         判断画面是否稳定(连续多帧变化小于阈值).
         
+        仅为兼容保留,AssertionWatcher 已改用 is_stable_from_diffs.
+        阈值针对的是像素平均差异 (pairwise_diffs).
+        
         Args:
-            recent_images: 最近的图片列表 (base64 格式)
+            recent_images: 最近的图片列表 (base64 数据或 decode() 的结果)
             stable_frames: 需要稳定的帧数
             stable_threshold: 稳定阈值
             
@@ -90,11 +253,59 @@ class ImageDiffChecker:
         """
         if len(recent_images) < stable_frames:
             return False
+        if stable_frames < 2:
+            return True
         
         # 检查最近 N 帧是否都很相似
-        for i in range(len(recent_images) - stable_frames + 1, len(recent_images)):
-            diff = self.calculate_diff(recent_images[i-1], recent_images[i])
-            if diff > stable_threshold:
-                return False
+        try:
+            diffs = self.pairwise_diffs(list(recent_images)[-stable_frames:])
+        except Exception as e:
+            print(f"⚠️  计算图片差异失败: {e}")
+            return True
+        return bool(diffs.max() <= stable_threshold)
+    
+    def is_stable_from_diffs(
+        self,
+        recent_diffs: Iterable[float],
+        stable_frames: int = 3,
+        stable_threshold: float = 0.05
+    ) -> bool:
+        """
+        根据已计算好的相邻帧差异判断画面是否稳定.
+        
+        复用之前算过的差异,每帧只需计算一次新差异.差异可以来自
+        calculate_diff (像素平均差异) 或 hash_diff (dHash 不同比特比例);
+        两者量纲不同,基于 hash_diff 的阈值与 is_stable 的阈值不可直接比较.
+        
+        Args:
+            recent_diffs: 最近相邻帧的差异度 (按时间顺序)
+            stable_frames: 需要稳定的帧数
+            stable_threshold: 稳定阈值,与 recent_diffs 的来源一致
+            
+        Returns:
+            画面是否稳定
+        """
+        recent_diffs = list(recent_diffs)
+        if len(recent_diffs) < stable_frames - 1:
+            return False
         
-        return True
+        # 只看最近 N-1 个相邻差异
+        window = recent_diffs[len(recent_diffs) - (stable_frames - 1):]
+        return not any(diff > stable_threshold for diff in window)
+    
+    def _as_array(self, image: Frame) -> "np.ndarray":
+        """将帧统一转换为缩小后的 uint8 数组."""
+        if isinstance(image, str):
+            return self.decode(image)
+        return image
+
+
+@functools.lru_cache(maxsize=1)
+def default_image_diff_checker() -> ImageDiffChecker:
+    """
+    获取共享的默认图片差异检测器.
+    
+    Returns:
+        使用默认阈值的 ImageDiffChecker 实例
+    """
+    return ImageDiffChecker()
@@ -1,11 +1,18 @@
 """OCR 引擎 - 封装屏幕文字识别功能."""
 
 import base64
+import functools
 import subprocess
 import json
-from typing import List
+from collections import OrderedDict
+from typing import List, Optional, Union
 from pathlib import Path
 
+from .image_diff import frame_digest
+
+# 按截图内容缓存的识别结果数量
+TEXT_CACHE_SIZE = 64
+
 
 class OCREngine:
     """OCR 引擎,用于识别屏幕中的文字内容."""
@@ -18,6 +25,13 @@ class OCREngine:
             device_id: 设备 ID
         """
         self.device_id = device_id
+        
+        # 最近一帧的识别结果,同一帧上的多个文字断言共享一次 OCR
+        self._cached_image: Optional[str] = None
+        self._cached_text = ""
+        self._cached_bytes: Optional[bytes] = None  # 按需编码的 UTF-8 版本
+        # 按截图内容摘要缓存识别结果,画面未变化的新截图无需重新 OCR
+        self._text_cache: "OrderedDict[bytes, str]" = OrderedDict()
     
     def extract_text(self, image_base64: str) -> List[str]:
         """
@@ -43,29 +57,81 @@ class OCREngine:
         
         return []
     
-    def contains_text(self, image_base64: str, target_text: str) -> bool:
+    def contains_text(self, image_base64: str, target_text: Union[str, bytes]) -> bool:
         """
         检查图片中是否包含指定文字.
         
         Args:
             image_base64: base64 编码的图片数据
-            target_text: 目标文字
+            target_text: 目标文字,也可以是预先编码好的 UTF-8 字节串
             
         Returns:
             是否包含目标文字
         """
-        texts = self.extract_text(image_base64)
-        return any(target_text in text for text in texts)
+        if isinstance(target_text, bytes):
+            return target_text in self.get_screen_bytes(image_base64)
+        return target_text in self.get_screen_text(image_base64)
+    
+    def get_screen_text(self, image_base64: str, digest: Optional[bytes] = None) -> str:
+        """
+        获取图片中识别出的全部文字 (按行拼接).
+        
+        同一帧只执行一次 OCR;内容相同的截图 (如画面静止时的连续轮询)
+        通过 BLAKE2b 摘要命中 LRU 缓存,同样不再重复识别.
+        
+        Args:
+            image_base64: base64 编码的图片数据
+            digest: 可选,调用方已算好的 frame_digest(image_base64)
+            
+        Returns:
+            以换行符拼接的识别文字
+        """
+        if image_base64 is not self._cached_image:
+            # 缓存键只保存 16 字节摘要,不持有截图本身
+            key = digest if digest is not None else frame_digest(image_base64)
+            text = self._text_cache.get(key)
+            if text is None:
+                text = "\n".join(self.extract_text(image_base64))
+                self._text_cache[key] = text
+                if len(self._text_cache) > TEXT_CACHE_SIZE:
+                    self._text_cache.popitem(last=False)
+            else:
+                self._text_cache.move_to_end(key)
+            self._cached_text = text
+            self._cached_bytes = None
+            self._cached_image = image_base64
+        return self._cached_text
     
-    def not_contains_text(self, image_base64: str, target_text: str) -> bool:
+    def get_screen_bytes(self, image_base64: str, digest: Optional[bytes] = None) -> bytes:
         """
-        检查图片中是否不包含指定文字.
+        获取图片中识别出的全部文字的 UTF-8 编码.
+        
+        每帧最多编码一次;UTF-8 下字节串包含关系与字符串包含关系等价.
         
         Args:
             image_base64: base64 编码的图片数据
-            target_text: 目标文字
+            digest: 可选,调用方已算好的 frame_digest(image_base64)
             
         Returns:
-            是否不包含目标文字
+            以换行符拼接的识别文字 (UTF-8)
         """
-        return not self.contains_text(image_base64, target_text)
+        text = self.get_screen_text(image_base64, digest)
+        if self._cached_bytes is None:
+            self._cached_bytes = text.encode('utf-8')
+        return self._cached_bytes
+
+
+@functools.lru_cache(maxsize=1)
+def default_ocr_engine(device_id: str = None) -> OCREngine:
+    """
+    获取共享的默认 OCR 引擎.
+    
+    OCR 模型加载开销较大,多个断言监听器/运行器复用同一个实例.
+    
+    Args:
+        device_id: 设备 ID
+        
+    Returns:
+        OCREngine 实例
+    """
+    return OCREngine(device_id)
@@ -51,6 +51,8 @@ class AssertionRunner:
         self._agent_thread = None
         self._agent_result = None
         self._agent_error = None
+        # 协作式取消: agent 在每一步之间检查该事件
+        self._cancel = threading.Event()
     
     def run_with_assertion(
         self,
@@ -80,38 +82,38 @@ class AssertionRunner:
             >>> if result.success:
             ...     print("断言通过!")
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         
-        # 转换断言格式
-        assertion_objects = [
-            Assertion(
-                type=a["type"],
-                value=a["value"],
-                timeout=a.get("timeout", timeout)
-            )
-            for a in assertions
-        ]
-        
-        print("=" * 70)
-        print("🚀 启动带断言的任务执行")
-        print("=" * 70)
-        print(f"📝 Prompt: {prompt}")
-        print(f"🔍 断言数量: {len(assertion_objects)}")
-        for idx, assertion in enumerate(assertion_objects, 1):
-            print(f"   {idx}. {assertion.type}: {assertion.value}")
-        print()
-        
-        # 1. 启动 AI 操作 (在单独线程中)
-        self._start_agent_async(prompt)
-        
-        # 2. 启动断言监听 (在主线程中)
         try:
+            # 转换断言格式 (断言配置有误时同样作为失败结果返回)
+            assertion_objects = [
+                Assertion(
+                    type=a["type"],
+                    value=a["value"],
+                    timeout=a.get("timeout", timeout)
+                )
+                for a in assertions
+            ]
+            
+            print("=" * 70)
+            print("🚀 启动带断言的任务执行")
+            print("=" * 70)
+            print(f"📝 Prompt: {prompt}")
+            print(f"🔍 断言数量: {len(assertion_objects)}")
+            for idx, assertion in enumerate(assertion_objects, 1):
+                print(f"   {idx}. {assertion.type}: {assertion.value}")
+            print()
+            
+            # 1. 启动 AI 操作 (在单独线程中)
+            self._start_agent_async(prompt)
+            
+            # 2. 启动断言监听 (在主线程中)
             hit, message = self.watcher.watch(assertion_objects, timeout)
             
             # 3. 停止 AI 操作
             self._stop_agent()
             
-            elapsed_time = time.time() - start_time
+            elapsed_time = time.monotonic() - start_time
             
             if hit:
                 # 断言命中 - 成功
@@ -136,7 +138,7 @@ class AssertionRunner:
         except Exception as e:
             # 异常 - 失败
             self._stop_agent()
-            elapsed_time = time.time() - start_time
+            elapsed_time = time.monotonic() - start_time
             
             screenshot_path = None
             if self.save_screenshot_func:
@@ -151,9 +153,13 @@ class AssertionRunner:
     
     def _start_agent_async(self, prompt: str):
         """在单独线程中启动 AI 操作."""
+        # 每次启动使用新的事件,上一次未退出的线程仍保持已取消状态
+        cancel_event = threading.Event()
+        self._cancel = cancel_event
+        
         def run_agent():
             try:
-                self._agent_result = self.agent.run(prompt)
+                self._agent_result = self.agent.run(prompt, cancel_event=cancel_event)
             except Exception as e:
                 self._agent_error = e
         
@@ -168,9 +174,11 @@ class AssertionRunner:
         # 停止监听
         self.watcher.stop()
         
-        # 注意: PhoneAgent 目前没有提供停止接口
-        # 这里只是标记,实际上 agent 会继续执行直到完成
-        # 如果需要强制停止,需要在 PhoneAgent 中添加停止机制
+        # 通知 agent 在当前步骤结束后停止,并短暂等待线程退出
+        # (正在进行中的模型请求/设备操作无法中断,超时后线程会在该步结束后自行退出)
+        self._cancel.set()
+        if self._agent_thread is not None:
+            self._agent_thread.join(timeout=2.0)
         
         print()
         print("⏹️  AI 操作已停止")
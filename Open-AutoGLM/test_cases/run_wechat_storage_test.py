@@ -18,14 +18,25 @@ import sys
 import os
 from pathlib import Path
 import time
+import traceback
 import hmac
 import hashlib
 import base64
+import json
+import logging
 import urllib.parse
+import atexit
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
+try:
+    # 可选依赖: 流式上传截图,未安装时回退到 requests 自带的 multipart
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
+
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -45,6 +56,115 @@ except Exception as e:
     print("将使用默认配置")
     config = {}
 
+# 钉钉通知的调试日志,设置环境变量 OPEN_AUTOGLM_DEBUG=1 时输出
+_log = logging.getLogger("autoglm.notify")
+if os.getenv("OPEN_AUTOGLM_DEBUG") == "1":
+    logging.basicConfig(format="[%(levelname)s] %(message)s")
+    _log.setLevel(logging.DEBUG)
+
+# 钉钉机器人配置
+DINGTALK_ACCESS_TOKEN = "7e9bbd283af35c7631c17282f7000f816c03e10b28c73081ff3f0a1d6aeb4cf8"
+DINGTALK_SECRET = "SEC2c8f6e8a664ce948eadb123f41957ea285d5b7cb532cef2a9675765f35f1bf5e"
+
+# 签名密钥固定不变,预先完成 HMAC 的密钥初始化,每次签名时 copy() 复用
+_SIGN_HMAC_TEMPLATE = hmac.new(DINGTALK_SECRET.encode('utf-8'), digestmod=hashlib.sha256)
+
+# 钉钉接口地址模板,access_token 固定,每次请求只需填入时间戳和签名
+_DD_ROBOT_URL = "https://oapi.dingtalk.com/robot/send?access_token=" + DINGTALK_ACCESS_TOKEN + "&timestamp={ts}&sign={sign}"
+_DD_UPLOAD_URL = f"https://oapi.dingtalk.com/media/upload?access_token={DINGTALK_ACCESS_TOKEN}&type=image"
+
+try:
+    # 可选依赖: orjson 直接输出 UTF-8 字节,速度更快
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+# 请求体已是 UTF-8 编码的 JSON 字节
+_JSON_HEADERS = {'Content-Type': 'application/json; charset=utf-8'}
+
+# 各类通知的标题与 markdown 模板,发送时只需填入时间、消息和堆栈
+_MSG_TEMPLATES = {
+    'manual_operation': (
+        "美团任务 - 人工操作提醒",
+        "## ⏸️ 美团团购券任务需要人工操作\n\n"
+        "**时间**: {ts}\n\n"
+        "**提示**: {msg}\n\n"
+        "**任务描述**: 购买美团团购券并复制券码\n\n"
+        "**请手动完成支付操作，完成后在控制台确认继续执行！**"
+    ),
+    'success': (
+        "美团任务成功通知",
+        "## ✅ 美团团购券任务执行成功\n\n"
+        "**时间**: {ts}\n\n"
+        "**任务描述**: 购买美团团购券并复制券码\n\n"
+        "整个任务流程已成功完成！"
+    ),
+    'interrupt': (
+        "美团任务中断通知",
+        "## ⚠️ 美团团购券任务被中断\n\n"
+        "**时间**: {ts}\n\n"
+        "**原因**: {msg}\n\n"
+        "**任务描述**: 购买美团团购券并复制券码"
+    ),
+    'error': (
+        "美团任务失败通知",
+        "## ❌ 美团团购券任务执行失败\n\n"
+        "**时间**: {ts}\n\n"
+        "**错误信息**: {msg}\n\n"
+        "{tb}"
+        "**任务描述**: 购买美团团购券并复制券码\n\n"
+        "请及时检查测试环境和日志！"
+    ),
+}
+
+# 复用同一个 HTTPS 连接池,多次通知之间免去 TCP/TLS 握手
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+atexit.register(_SESSION.close)
+
+# 截图上传在后台线程进行,与签名和消息内容构造并行
+_UPLOAD_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dingtalk-upload")
+
+
+def _upload_media(screenshot_path: str) -> Optional[str]:
+    """
+    上传图片到钉钉
+    
+    Args:
+        screenshot_path: 要上传的截图路径
+        
+    Returns:
+        上传成功时返回 media_id，否则返回 None
+    """
+    try:
+        with open(screenshot_path, 'rb') as f:
+            media = (os.path.basename(screenshot_path), f, 'image/png')
+            if MultipartEncoder is not None:
+                # 边读文件边发送,不在内存中拼出完整请求体
+                encoder = MultipartEncoder(fields={'media': media})
+                upload_response = _SESSION.post(
+                    _DD_UPLOAD_URL,
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type},
+                    timeout=30
+                )
+            else:
+                upload_response = _SESSION.post(_DD_UPLOAD_URL, files={'media': media}, timeout=30)
+        if upload_response.status_code == 200:
+            upload_result = upload_response.json()
+            if upload_result.get('errcode') == 0:
+                return upload_result['media_id']
+            print(f"⚠️  上传图片失败: {upload_result.get('errmsg')}")
+        else:
+            print(f"⚠️  上传图片请求失败: HTTP {upload_response.status_code}")
+    except Exception as file_err:
+        print(f"⚠️  读取或上传图片文件失败: {file_err}")
+    return None
+
+
+
 def send_dingtalk_notification(message_type: str, error_message: str = "", traceback_info: str = "", screenshot_path: Optional[str] = None):
     """
     发送钉钉机器人通知
@@ -55,77 +175,42 @@ def send_dingtalk_notification(message_type: str, error_message: str = "", trace
         traceback_info: 堆栈跟踪信息
         screenshot_path: 可选，要上传的截图路径
     """
-    # 钉钉机器人配置
-    access_token = "7e9bbd283af35c7631c17282f7000f816c03e10b28c73081ff3f0a1d6aeb4cf8"
-    secret = "SEC2c8f6e8a664ce948eadb123f41957ea285d5b7cb532cef2a9675765f35f1bf5e"
-    
     try:
-        print(f"[DEBUG] 开始发送钉钉通知, 类型: {message_type}")
+        _log.debug("开始发送钉钉通知, 类型: %s", message_type)
+        
+        # 如果有截图，先在后台开始上传 (文件不存在时 _upload_media 会打印提示并返回 None)
+        upload_future = None
+        if screenshot_path:
+            upload_future = _UPLOAD_EXECUTOR.submit(_upload_media, screenshot_path)
         
         # 生成签名
         timestamp = str(round(time.time() * 1000))
-        secret_enc = secret.encode('utf-8')
-        string_to_sign = '{}\n{}'.format(timestamp, secret)
-        string_to_sign_enc = string_to_sign.encode('utf-8')
-        hmac_code = hmac.new(secret_enc, string_to_sign_enc, digestmod=hashlib.sha256).digest()
-        sign = urllib.parse.quote_plus(base64.b64encode(hmac_code))
+        string_to_sign = '{}\n{}'.format(timestamp, DINGTALK_SECRET)
+        sign_hmac = _SIGN_HMAC_TEMPLATE.copy()
+        sign_hmac.update(string_to_sign.encode('utf-8'))
+        hmac_code = sign_hmac.digest()
+        sign = urllib.parse.quote(base64.b64encode(hmac_code).decode('ascii'), safe='')
         
-        print(f"[DEBUG] 签名生成成功, timestamp: {timestamp}")
+        _log.debug("签名生成成功, timestamp: %s", timestamp)
         
         # 构造请求URL
-        url = f"https://oapi.dingtalk.com/robot/send?access_token={access_token}&timestamp={timestamp}&sign={sign}"
+        url = _DD_ROBOT_URL.format(ts=timestamp, sign=sign)
         
         # 根据消息类型构造不同的消息内容
-        if message_type == 'manual_operation':
-            title = "美团任务 - 人工操作提醒"
-            content = f"## ⏸️ 美团团购券任务需要人工操作\n\n"
-            content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += f"**提示**: {error_message}\n\n"
-            content += f"**任务描述**: 购买美团团购券并复制券码\n\n"
-            content += "**请手动完成支付操作，完成后在控制台确认继续执行！**"
-        elif message_type == 'success':
-            title = "美团任务成功通知"
-            content = f"## ✅ 美团团购券任务执行成功\n\n"
-            content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += f"**任务描述**: 购买美团团购券并复制券码\n\n"
-            content += "整个任务流程已成功完成！"
-        elif message_type == 'interrupt':
-            title = "美团任务中断通知"
-            content = f"## ⚠️ 美团团购券任务被中断\n\n"
-            content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += f"**原因**: {error_message}\n\n"
-            content += f"**任务描述**: 购买美团团购券并复制券码"
-        else:  # error
-            title = "美团任务失败通知"
-            content = f"## ❌ 美团团购券任务执行失败\n\n"
-            content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += f"**错误信息**: {error_message}\n\n"
-            
-            if traceback_info:
-                content += f"**详细堆栈**:\n```\n{traceback_info}\n```\n\n"
-            
-            content += f"**任务描述**: 购买美团团购券并复制券码\n\n"
-            content += "请及时检查测试环境和日志！"
+        ts = time.strftime('%Y-%m-%d %H:%M:%S')
+        title, template = _MSG_TEMPLATES.get(message_type, _MSG_TEMPLATES['error'])
+        tb = f"**详细堆栈**:\n```\n{traceback_info}\n```\n\n" if traceback_info else ""
+        content = template.format(ts=ts, msg=error_message, tb=tb)
         
-        # 如果有截图，则添加到消息内容中
-        if screenshot_path and os.path.exists(screenshot_path):
-            # 尝试上传图片到钉钉
-            upload_url = f"https://oapi.dingtalk.com/media/upload?access_token={access_token}&type=image"
+        # 如果有截图，等待上传完成后添加到消息内容中
+        if upload_future is not None:
             try:
-                with open(screenshot_path, 'rb') as f:
-                    files = {'media': f}
-                    upload_response = requests.post(upload_url, files=files, timeout=30)
-                    if upload_response.status_code == 200:
-                        upload_result = upload_response.json()
-                        if upload_result.get('errcode') == 0:
-                            media_id = upload_result['media_id']
-                            content += f"\n![失败截图](https://oapi.dingtalk.com/media/download?media_id={media_id})"
-                        else:
-                            print(f"⚠️  上传图片失败: {upload_result.get('errmsg')}")
-                    else:
-                        print(f"⚠️  上传图片请求失败: HTTP {upload_response.status_code}")
-            except Exception as file_err:
-                print(f"⚠️  读取或上传图片文件失败: {file_err}")
+                media_id = upload_future.result(timeout=30)
+            except Exception as upload_err:
+                print(f"⚠️  等待图片上传失败: {upload_err}")
+                media_id = None
+            if media_id:
+                content += f"\n![失败截图](https://oapi.dingtalk.com/media/download?media_id={media_id})"
 
         # 构造请求体
         data = {
@@ -136,29 +221,27 @@ def send_dingtalk_notification(message_type: str, error_message: str = "", trace
             }
         }
         
-        print(f"[DEBUG] 请求体构造完成, 标题: {title}")
+        _log.debug("请求体构造完成, 标题: %s", title)
         
         # 发送POST请求
-        headers = {'Content-Type': 'application/json'}
-        print(f"[DEBUG] 发送POST请求到钉钉...")
-        response = requests.post(url, headers=headers, data=json.dumps(data), timeout=10)
+        _log.debug("发送POST请求到钉钉...")
+        response = _SESSION.post(url, data=_dumps(data), headers=_JSON_HEADERS, timeout=10)
         
-        print(f"[DEBUG] 响应状态码: {response.status_code}")
+        _log.debug("响应状态码: %s", response.status_code)
         
         if response.status_code == 200:
             result = response.json()
-            print(f"[DEBUG] 响应内容: {result}")
+            _log.debug("响应内容: %s", result)
             if result.get('errcode') == 0:
                 print("✅ 钉钉通知发送成功")
             else:
                 print(f"⚠️  钉钉通知发送失败: {result.get('errmsg')}")
         else:
             print(f"⚠️  钉钉通知发送失败: HTTP {response.status_code}")
-            print(f"[DEBUG] 响应内容: {response.text}")
+            _log.debug("响应内容: %s", response.text)
             
     except Exception as e:
         print(f"⚠️  钉钉通知发送异常: {e}")
-        import traceback
         traceback.print_exc()
 
 
@@ -281,17 +364,26 @@ def main():
             error_msg = f"任务执行失败: {original_error_str}"
 
         print(f"\n\n❌ {error_msg}")
-        import traceback
         tb_str = traceback.format_exc()
         traceback.print_exc()
         
         # 查找最新的截图文件作为错误截图
         latest_screenshot = None
-        if unified_screenshot_dir.exists():
-            screenshot_files = sorted(unified_screenshot_dir.glob("*.png"), key=os.path.getmtime, reverse=True)
-            if screenshot_files:
-                latest_screenshot = str(screenshot_files[0])
-                print(f"📁 将使用最新截图 {latest_screenshot} 作为错误报告附件")
+        # 单次遍历目录取修改时间最新的 png,无需排序全部文件
+        # (目录在启动时已创建,被外部删除时视为没有截图)
+        latest_mtime = -1.0
+        try:
+            with os.scandir(unified_screenshot_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.png') and entry.is_file():
+                        mtime = entry.stat().st_mtime
+                        if mtime > latest_mtime:
+                            latest_mtime = mtime
+                            latest_screenshot = entry.path
+        except FileNotFoundError:
+            pass
+        if latest_screenshot:
+            print(f"📁 将使用最新截图 {latest_screenshot} 作为错误报告附件")
 
         # 发送钉钉通知，附带最新的截图和中文错误信息
         send_dingtalk_notification('error', error_msg, tb_str, latest_screenshot)
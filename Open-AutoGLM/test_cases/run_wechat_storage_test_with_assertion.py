@@ -19,13 +19,18 @@ import sys
 import os
 from pathlib import Path
 import time
+import traceback
 import hmac
 import hashlib
 import base64
+import json
+import logging
 import urllib.parse
+from dataclasses import dataclass
+import atexit
 import requests
-import json
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Optional, Tuple
 
 # 添加项目根目录到路径
 project_root = Path(__file__).parent.parent
@@ -48,60 +53,100 @@ except Exception as e:
     config = {}
 
 
-def send_dingtalk_notification(message_type: str, error_message: str = "", traceback_info: str = ""):
-    """发送钉钉机器人通知."""
-    # 钉钉机器人配置
-    access_token = "7e9bbd283af35c7631c17282f7000f816c03e10b28c73081ff3f0a1d6aeb4cf8"
-    secret = "SEC2c8f6e8a664ce948eadb123f41957ea285d5b7cb532cef2a9675765f35f1bf5e"
+# 钉钉通知的调试日志,设置环境变量 OPEN_AUTOGLM_DEBUG=1 时输出
+_log = logging.getLogger("autoglm.notify")
+if os.getenv("OPEN_AUTOGLM_DEBUG") == "1":
+    logging.basicConfig(format="[%(levelname)s] %(message)s")
+    _log.setLevel(logging.DEBUG)
+
+# 钉钉机器人配置
+DINGTALK_ACCESS_TOKEN = "7e9bbd283af35c7631c17282f7000f816c03e10b28c73081ff3f0a1d6aeb4cf8"
+DINGTALK_SECRET = "SEC2c8f6e8a664ce948eadb123f41957ea285d5b7cb532cef2a9675765f35f1bf5e"
+
+# 签名密钥固定不变,预先完成 HMAC 的密钥初始化,每次签名时 copy() 复用
+_SIGN_HMAC_TEMPLATE = hmac.new(DINGTALK_SECRET.encode('utf-8'), digestmod=hashlib.sha256)
+
+# 钉钉接口地址模板,access_token 固定,每次请求只需填入时间戳和签名
+_DD_ROBOT_URL = "https://oapi.dingtalk.com/robot/send?access_token=" + DINGTALK_ACCESS_TOKEN + "&timestamp={ts}&sign={sign}"
+
+try:
+    # 可选依赖: orjson 直接输出 UTF-8 字节,速度更快
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+# 请求体已是 UTF-8 编码的 JSON 字节
+_JSON_HEADERS = {'Content-Type': 'application/json; charset=utf-8'}
+
+# 各类通知的标题与 markdown 模板,发送时只需填入时间、消息和堆栈
+_MSG_TEMPLATES = {
+    'manual_operation': (
+        "微柜v3测试 - 人工操作提醒",
+        "## ⏸️ 微柜v3测试需要人工操作\n\n"
+        "**时间**: {ts}\n\n"
+        "**提示**: {msg}\n\n"
+        "**测试用例**: 微柜v3小程序寄存流程测试\n\n"
+        "**请手动完成操作，完成后在控制台确认继续执行！**"
+    ),
+    'success': (
+        "微柜v3测试成功通知",
+        "## ✅ 微柜v3测试执行成功\n\n"
+        "**时间**: {ts}\n\n"
+        "**测试用例**: 微柜v3小程序寄存流程测试\n\n"
+        "所有测试步骤已成功完成！"
+    ),
+    'interrupt': (
+        "微柜v3测试中断通知",
+        "## ⚠️ 微柜v3测试被中断\n\n"
+        "**时间**: {ts}\n\n"
+        "**原因**: {msg}\n\n"
+        "**测试用例**: 微柜v3小程序寄存流程测试"
+    ),
+    'error': (
+        "微柜v3测试失败通知",
+        "## ❌ 微柜v3测试执行失败\n\n"
+        "**时间**: {ts}\n\n"
+        "**错误信息**: {msg}\n\n"
+        "{tb}"
+        "**测试用例**: 微柜v3小程序寄存流程测试\n\n"
+        "请及时检查测试环境和日志！"
+    ),
+}
+
+# 复用同一个 HTTPS 连接池,多次通知之间免去 TCP/TLS 握手
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+atexit.register(_SESSION.close)
+
+
+def _build_message(message_type: str, error_message: str = "", traceback_info: str = "") -> Tuple[str, str]:
+    """根据消息类型构造钉钉 markdown 消息的标题和内容."""
+    ts = time.strftime('%Y-%m-%d %H:%M:%S')
+    title, template = _MSG_TEMPLATES.get(message_type, _MSG_TEMPLATES['error'])
+    tb = f"**详细堆栈**:\n```\n{traceback_info}\n```\n\n" if traceback_info else ""
+    content = template.format(ts=ts, msg=error_message, tb=tb)
     
+    return title, content
+
+
+def _post_markdown(title: str, content: str):
+    """签名并发送一条钉钉 markdown 消息."""
     try:
-        print(f"[DEBUG] 开始发送钉钉通知, 类型: {message_type}")
-        
         # 生成签名
         timestamp = str(round(time.time() * 1000))
-        secret_enc = secret.encode('utf-8')
-        string_to_sign = '{}\n{}'.format(timestamp, secret)
-        string_to_sign_enc = string_to_sign.encode('utf-8')
-        hmac_code = hmac.new(secret_enc, string_to_sign_enc, digestmod=hashlib.sha256).digest()
-        sign = urllib.parse.quote_plus(base64.b64encode(hmac_code))
+        string_to_sign = '{}\n{}'.format(timestamp, DINGTALK_SECRET)
+        sign_hmac = _SIGN_HMAC_TEMPLATE.copy()
+        sign_hmac.update(string_to_sign.encode('utf-8'))
+        hmac_code = sign_hmac.digest()
+        sign = urllib.parse.quote(base64.b64encode(hmac_code).decode('ascii'), safe='')
         
-        print(f"[DEBUG] 签名生成成功, timestamp: {timestamp}")
+        _log.debug("签名生成成功, timestamp: %s", timestamp)
         
         # 构造请求URL
-        url = f"https://oapi.dingtalk.com/robot/send?access_token={access_token}&timestamp={timestamp}&sign={sign}"
-
-        # 根据消息类型构造不同的消息内容
-        if message_type == 'manual_operation':
-            title = "微柜v3测试 - 人工操作提醒"
-            content = f"## ⏸️ 微柜v3测试需要人工操作\n\n"
-            content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += f"**提示**: {error_message}\n\n"
-            content += f"**测试用例**: 微柜v3小程序寄存流程测试\n\n"
-            content += "**请手动完成操作，完成后在控制台确认继续执行！**"
-        elif message_type == 'success':
-            title = "微柜v3测试成功通知"
-            content = f"## ✅ 微柜v3测试执行成功\n\n"
-            content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += f"**测试用例**: 微柜v3小程序寄存流程测试\n\n"
-            content += "所有测试步骤已成功完成！"
-        elif message_type == 'interrupt':
-            title = "微柜v3测试中断通知"
-            content = f"## ⚠️ 微柜v3测试被中断\n\n"
-            content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += f"**原因**: {error_message}\n\n"
-            content += f"**测试用例**: 微柜v3小程序寄存流程测试"
-        else:  # error
-            title = "微柜v3测试失败通知"
-            content = f"## ❌ 微柜v3测试执行失败\n\n"
-            content += f"**时间**: {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            content += f"**错误信息**: {error_message}\n\n"
-            
-            if traceback_info:
-                content += f"**详细堆栈**:\n```\n{traceback_info}\n```\n\n"
-            
-            content += f"**测试用例**: 微柜v3小程序寄存流程测试\n\n"
-            content += "请及时检查测试环境和日志！"
-        
+        url = _DD_ROBOT_URL.format(ts=timestamp, sign=sign)
+
         # 构造请求体
         data = {
             "msgtype": "markdown",
@@ -111,58 +156,95 @@ def send_dingtalk_notification(message_type: str, error_message: str = "", trace
             }
         }
         
-        print(f"[DEBUG] 请求体构造完成, 标题: {title}")
+        _log.debug("请求体构造完成, 标题: %s", title)
         
         # 发送POST请求
-        headers = {'Content-Type': 'application/json'}
-        print(f"[DEBUG] 发送POST请求到钉钉...")
-        response = requests.post(url, headers=headers, data=json.dumps(data), timeout=10)
+        _log.debug("发送POST请求到钉钉...")
+        response = _SESSION.post(url, data=_dumps(data), headers=_JSON_HEADERS, timeout=10)
         
-        print(f"[DEBUG] 响应状态码: {response.status_code}")
+        _log.debug("响应状态码: %s", response.status_code)
         
         if response.status_code == 200:
             result = response.json()
-            print(f"[DEBUG] 响应内容: {result}")
+            _log.debug("响应内容: %s", result)
             if result.get('errcode') == 0:
                 print("✅ 钉钉通知发送成功")
             else:
                 print(f"⚠️  钉钉通知发送失败: {result.get('errmsg')}")
         else:
             print(f"⚠️  钉钉通知发送失败: HTTP {response.status_code}")
-            print(f"[DEBUG] 响应内容: {response.text}")
+            _log.debug("响应内容: %s", response.text)
             
     except Exception as e:
         print(f"⚠️  钉钉通知发送异常: {e}")
-        import traceback
         traceback.print_exc()
 
 
+def send_dingtalk_notification(message_type: str, error_message: str = "", traceback_info: str = ""):
+    """发送钉钉机器人通知."""
+    _log.debug("开始发送钉钉通知, 类型: %s", message_type)
+    title, content = _build_message(message_type, error_message, traceback_info)
+    _post_markdown(title, content)
+
+
 def create_screenshot_func(device_id=None):
     """创建截图函数."""
+    device_factory = get_device_factory()
+
     def screenshot():
-        device_factory = get_device_factory()
         screenshot_obj = device_factory.get_screenshot(device_id)
         return screenshot_obj.base64_data
     return screenshot
 
 
+def _wait_stable(device_id=None, timeout: float = 2.0, poll: float = 0.2):
+    """
+    步骤间等待界面稳定.
+    
+    连续两次截图内容一致即返回,最多等待 timeout 秒,代替固定的 sleep.
+    敏感页面 (如支付页) 或截图失败时拿到的是固定的兜底图,无法判断画面
+    是否稳定,此时等满 timeout.
+    
+    Args:
+        device_id: 设备 ID
+        timeout: 最长等待时间(秒)
+        poll: 两次截图之间的间隔(秒)
+    """
+    device_factory = get_device_factory()
+    deadline = time.monotonic() + timeout
+    last_digest = None
+    while True:
+        screenshot_obj = device_factory.get_screenshot(device_id)
+        if screenshot_obj.is_sensitive or screenshot_obj.is_fallback:
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            return
+        # base64 与原始字节一一对应,直接对编码后的内容做哈希即可判断是否相同
+        digest = hashlib.blake2b(
+            screenshot_obj.base64_data.encode('ascii'), digest_size=8
+        ).digest()
+        if digest == last_digest:
+            return
+        last_digest = digest
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(poll, remaining))
+
+
 def create_save_screenshot_func(agent_config):
     """创建保存截图函数."""
+    screenshot_dir = Path(agent_config.screenshot_dir) / "assertion_failures"
+    screenshot_dir.mkdir(parents=True, exist_ok=True)
+    device_factory = get_device_factory()
+
     def save_screenshot():
         try:
             timestamp = time.strftime("%Y%m%d_%H%M%S")
-            screenshot_dir = Path(agent_config.screenshot_dir) / "assertion_failures"
-            screenshot_dir.mkdir(parents=True, exist_ok=True)
-            
             filepath = screenshot_dir / f"failure_{timestamp}.png"
             
-            device_factory = get_device_factory()
             screenshot_obj = device_factory.get_screenshot(agent_config.device_id)
             
-            import base64
-            image_data = base64.b64decode(screenshot_obj.base64_data)
-            with open(filepath, "wb") as f:
-                f.write(image_data)
+            filepath.write_bytes(base64.b64decode(screenshot_obj.base64_data))
             
             print(f"📸 失败截图已保存: {filepath}")
             return str(filepath)
@@ -173,122 +255,94 @@ def create_save_screenshot_func(agent_config):
     return save_screenshot
 
 
+@dataclass(slots=True, frozen=True)
+class Step:
+    """测试步骤定义."""
+
+    step: int
+    description: str
+    prompt: Optional[str] = None
+    task: Optional[str] = None
+    is_manual: bool = False
+    is_critical: bool = False
+    manual_instruction: Optional[str] = None
+    assertions: Tuple[dict, ...] = ()
+
+
+# 本测试使用的 agent 配置项及其默认值
+AGENT_CONFIG_DEFAULTS = {
+    'max_steps': 100,
+    'device_id': None,
+    'verbose': True,
+    'lang': 'cn',
+    'save_screenshots': True,
+    'screenshot_dir': './screenshots',
+}
+
+
+# 测试步骤列表 - 带断言配置
+STEPS: Tuple[Step, ...] = (
+    Step(1, "打开微信", prompt="打开微信应用,等待页面完全加载"),
+    Step(2, "进入发现页面", prompt="点击底部导航栏的发现标签"),
+    Step(3, "进入小程序", prompt="点击小程序选项"),
+    Step(4, "打开微信开发者助手", prompt="找到微信开发者助手并进入这个小程序"),
+    Step(5, "进入我的业务", prompt="从我的业务中点击小程序选项"),
+    Step(6, "查找微柜v3", prompt="在小程序列表中找到微柜v3"),
+    Step(7, "进入体验版", prompt="从版本查看中进入体验版"),
+    Step(8, "点击存包", prompt="点击存包按钮"),
+    Step(9, "选择二维码", prompt="进入拍摄页面后，点击右下角相册，选择一张二维码图片"),
+    Step(
+        10, "选择柜子",
+        prompt="点击确认按钮,然后选择小柜",
+        assertions=(
+            {"type": "text_exists", "value": "小柜", "timeout": 8},
+            {"type": "text_exists", "value": "中柜", "timeout": 8},
+        ),
+    ),
+    Step(
+        11, "同意用户协议",
+        prompt="点击同意用户协议",
+        assertions=(
+            {"type": "text_exists", "value": "同意并继续", "timeout": 5},
+        ),
+    ),
+    Step(
+        12, "输入取物密码",
+        prompt="点击输入取物密码,输入1111",
+        assertions=(
+            {"type": "text_exists", "value": "确认下单", "timeout": 5},
+        ),
+    ),
+    Step(13, "确认下单", prompt="点击确认下单按钮"),
+    Step(
+        14, "放弃添加保险",
+        prompt="点击放弃添加按钮",
+        assertions=(
+            {"type": "text_exists", "value": "放弃添加", "timeout": 5},
+        ),
+    ),
+    Step(15, "进入支付页面", prompt="点击确认下单按钮,等待进入支付页面"),
+    Step(
+        16, "人工支付操作",
+        task="manual_payment",
+        is_manual=True,
+        manual_instruction="请手动完成支付操作：\n1. 点击支付按钮\n2. 输入支付密码\n3. 等待支付完成\n4. 确认支付成功后按回车键继续",
+    ),
+    Step(17, "等待柜门开启", prompt="等待柜门开启"),
+    Step(
+        18, "完成寄存",
+        prompt="点击寄存完成按钮",
+        assertions=(
+            {"type": "text_exists", "value": "寄存完成", "timeout": 5},
+        ),
+        is_critical=True,
+    ),
+)
+
+
 def main():
     """执行微柜v3寄存流程测试 - 带断言版本."""
     
-    # 测试步骤列表 - 带断言配置
-    test_steps = [
-        {
-            "step": 1,
-            "description": "打开微信",
-            "prompt": "打开微信应用,等待页面完全加载"
-        },
-        {
-            "step": 2,
-            "description": "进入发现页面",
-            "prompt": "点击底部导航栏的发现标签"
-        },
-        {
-            "step": 3,
-            "description": "进入小程序",
-            "prompt": "点击小程序选项"
-        },
-        {
-            "step": 4,
-            "description": "打开微信开发者助手",
-            "prompt": "找到微信开发者助手并进入这个小程序"
-        },
-        {
-            "step": 5,
-            "description": "进入我的业务",
-            "prompt": "从我的业务中点击小程序选项"
-        },
-        {
-            "step": 6,
-            "description": "查找微柜v3",
-            "prompt": "在小程序列表中找到微柜v3"
-        },
-        {
-            "step": 7,
-            "description": "进入体验版",
-            "prompt": "从版本查看中进入体验版"
-        },
-        {
-            "step": 8,
-            "description": "点击存包",
-            "prompt": "点击存包按钮"
-        },
-        {
-            "step": 9,
-            "description": "选择二维码",
-            "prompt": "进入拍摄页面后，点击右下角相册，选择一张二维码图片"
-        },
-        {
-            "step": 10,
-            "description": "选择柜子",
-            "prompt": "点击确认按钮,然后选择小柜",
-            "assertions": [
-                {"type": "text_exists", "value": "小柜", "timeout": 8},
-                {"type": "text_exists", "value": "中柜", "timeout": 8}
-            ]
-        },
-        {
-            "step": 11,
-            "description": "同意用户协议",
-            "prompt": "点击同意用户协议",
-            "assertions": [
-                {"type": "text_exists", "value": "同意并继续", "timeout": 5}
-            ]
-        },
-        {
-            "step": 12,
-            "description": "输入取物密码",
-            "prompt": "点击输入取物密码,输入1111",
-            "assertions": [
-                {"type": "text_exists", "value": "确认下单", "timeout": 5}
-            ]
-        },
-        {
-            "step": 13,
-            "description": "确认下单",
-            "prompt": "点击确认下单按钮"
-        },
-        {
-            "step": 14,
-            "description": "放弃添加保险",
-            "prompt": "点击放弃添加按钮",
-            "assertions": [
-                {"type": "text_exists","value": "放弃添加", "timeout": 5}
-            ]
-        },
-        {
-            "step": 15,
-            "description": "进入支付页面",
-            "prompt": "点击确认下单按钮,等待进入支付页面"
-        },
-        {
-            "step": 16,
-            "description": "人工支付操作",
-            "task": "manual_payment",
-            "is_manual": True,
-            "manual_instruction": "请手动完成支付操作：\n1. 点击支付按钮\n2. 输入支付密码\n3. 等待支付完成\n4. 确认支付成功后按回车键继续"
-        },
-        {
-            "step": 17,
-            "description": "等待柜门开启",
-            "prompt": "等待柜门开启"
-        },
-        {
-            "step": 18,
-            "description": "完成寄存",
-            "prompt": "点击寄存完成按钮",
-            "assertions": [
-                {"type": "text_exists", "value": "寄存完成", "timeout": 5}
-            ],
-            "is_critical": True
-        }
-    ]
-    
     print("=" * 70)
     print("微柜v3小程序寄存流程测试 - 带断言版本")
     print("=" * 70)
@@ -296,7 +350,7 @@ def main():
     print("📋 测试用例详情:")
     print("  - 测试名称: 微柜v3小程序寄存流程测试")
     print("  - 测试应用: 微信小程序 - 微柜v3")
-    print(f"  - 测试步骤: {len(test_steps)}步")
+    print(f"  - 测试步骤: {len(STEPS)}步")
     print("  - 涉及功能: 寄存、人工支付、断言验证")
     print()
     print("⚠️  重要提示:")
@@ -329,15 +383,10 @@ def main():
             lang=config.get('agent', {}).get('lang', 'cn')
         )
         
-        # 从配置中获取 agent 配置
-        agent_config_dict = config.get('agent', {})
+        # 从配置中获取 agent 配置,缺省项使用默认值
+        agent_config_dict = {**AGENT_CONFIG_DEFAULTS, **config.get('agent', {})}
         agent_config = AgentConfig(
-            max_steps=agent_config_dict.get('max_steps', 100),
-            device_id=agent_config_dict.get('device_id'),
-            verbose=agent_config_dict.get('verbose', True),
-            lang=agent_config_dict.get('lang', 'cn'),
-            save_screenshots=agent_config_dict.get('save_screenshots', True),
-            screenshot_dir=agent_config_dict.get('screenshot_dir', './screenshots')
+            **{key: agent_config_dict[key] for key in AGENT_CONFIG_DEFAULTS}
         )
         
         print(f"🤖 模型配置:")
@@ -374,19 +423,19 @@ def main():
         print()
         
         # 执行分步测试
-        for idx, test_step in enumerate(test_steps, 1):
-            step_num = test_step['step']
-            description = test_step['description']
-            is_critical = test_step.get('is_critical', False)
-            is_manual = test_step.get('is_manual', False)
+        for test_step in STEPS:
+            step_num = test_step.step
+            description = test_step.description
+            is_critical = test_step.is_critical
+            is_manual = test_step.is_manual
             
             print(f"{'='*70}")
-            print(f"步骤 {step_num}/{len(test_steps)}: {description}")
+            print(f"步骤 {step_num}/{len(STEPS)}: {description}")
             print(f"{'='*70}")
             
             # 如果是人工操作步骤
             if is_manual:
-                manual_instruction = test_step.get('manual_instruction', '')
+                manual_instruction = test_step.manual_instruction or ''
                 print(f"⏸️  需要人工操作")
                 print()
                 print(manual_instruction)
@@ -401,7 +450,6 @@ def main():
                     )
                 except Exception as e:
                     print(f"⚠️  钉钉通知发送失败: {e}")
-                    import traceback
                     traceback.print_exc()
                 
                 # 等待用户确认
@@ -409,18 +457,18 @@ def main():
                 print("✅ 人工操作已确认完成")
                 print()
                 
-                # 步骤间延迟
-                time.sleep(2)
+                # 步骤间等待界面稳定
+                _wait_stable(agent_config.device_id)
                 continue
             
             # 检查是否有断言配置
-            has_assertions = 'assertions' in test_step and test_step['assertions']
+            has_assertions = bool(test_step.assertions)
             
             try:
                 if has_assertions:
                     # 执行带断言的任务
-                    prompt = test_step['prompt']
-                    assertions = test_step['assertions']
+                    prompt = test_step.prompt
+                    assertions = list(test_step.assertions)
                     
                     print(f"📝 任务: {prompt}")
                     print(f"🔍 断言数量: {len(assertions)}")
@@ -432,6 +480,7 @@ def main():
                         timeout=15
                     )
                     
+                    settled = result.success
                     if result.success:
                         print(f"✅ 步骤 {step_num} 断言通过: {result.message}")
                         print(f"⏱️  耗时: {result.elapsed_time:.2f}秒")
@@ -443,35 +492,34 @@ def main():
                         
                         # 如果是关键步骤,发送通知并退出
                         if is_critical:
-                            import traceback
-                            tb_str = traceback.format_exc()
+                            # 断言失败不是异常,没有可用的堆栈信息
                             send_dingtalk_notification(
                                 'error',
-                                f"关键步骤 {step_num} 断言失败: {description}\n{result.message}",
-                                tb_str
+                                f"关键步骤 {step_num} 断言失败: {description}\n{result.message}"
                             )
                             raise AssertionError(f"关键步骤 {step_num} 断言失败")
                 else:
                     # 无断言的步骤,直接执行
-                    task = test_step.get('prompt') or test_step.get('task', '')
+                    task = test_step.prompt or test_step.task or ''
                     print(f"📝 任务: {task}")
                     print(f"ℹ️  无断言检查,直接执行")
                     
                     # 直接执行
                     agent.run(task)
                     print("✅ 任务执行完成")
+                    settled = False
                 
                 print()
                 
-                # 步骤间延迟
-                time.sleep(2)
+                # 断言通过说明界面已到达预期状态,否则等待界面稳定
+                if not settled:
+                    _wait_stable(agent_config.device_id)
                 
             except Exception as e:
                 print(f"❌ 步骤 {step_num} 执行失败: {e}")
                 
                 # 如果是关键步骤,发送通知并退出
                 if is_critical:
-                    import traceback
                     tb_str = traceback.format_exc()
                     send_dingtalk_notification(
                         'error',
@@ -501,7 +549,6 @@ def main():
         sys.exit(1)
     except Exception as e:
         print(f"\n\n❌ 测试执行失败: {e}")
-        import traceback
         tb_str = traceback.format_exc()
         traceback.print_exc()
         # 发送钉钉通知